@@ -1,12 +1,17 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from pydantic import BaseModel
-from typing import List, Optional
+from starlette.routing import Route
+from contextlib import asynccontextmanager
+import orjson
 import os
 from dotenv import load_dotenv
 import asyncio
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,16 +20,108 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="ElevenLabs Clone API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect and load data before serving, disconnect on shutdown"""
+    await startup_event()
+    yield
+    await shutdown_event()
+
+app = FastAPI(
+    title="ElevenLabs Clone API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+class FastCORS:
+    """Pure ASGI CORS middleware for a fixed origin allow-list
+
+    Credentials are always allowed and any requested header is accepted,
+    matching the CORSMiddleware settings this replaces. Origins and header
+    values are encoded once up front so requests only compare bytes.
+    """
+
+    def __init__(self, app, allow_origins, allow_methods, max_age=600):
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_all_origins = b"*" in self.allow_origins
+        self.allow_methods = frozenset(method.encode("latin-1") for method in allow_methods)
+        self.preflight_headers = [
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin"),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        origin_allowed = self.allow_all_origins or origin in self.allow_origins
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self.preflight(send, origin, origin_allowed, request_method, request_headers)
+            return
+
+        if not origin_allowed:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def preflight(self, send, origin, origin_allowed, request_method, request_headers):
+        if not origin_allowed or request_method not in self.allow_methods:
+            body = b"Disallowed CORS request"
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", origin), *self.preflight_headers]
+        if request_headers is not None:
+            headers.append((b"access-control-allow-headers", request_headers))
+
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
 
 # CORS configuration for production
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 app.add_middleware(
-    CORSMiddleware,
+    FastCORS,
     allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
 )
 
 # MongoDB configuration
@@ -32,6 +129,22 @@ MONGODB_URL = os.getenv("MONGODB_URL")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "elevenlabs_clone")
 COLLECTION_NAME = "audio_files"
 
+# Fields we return, plus _id (included by default) for documents stored
+# without an id; anything else on the document stays off the wire
+AUDIO_PROJECTION = {"id": 1, "language": 1, "audio_url": 1, "text_content": 1}
+
+def shape_audio_document(document):
+    """Reduce a stored document to the AudioFile fields, deriving a missing id from _id"""
+    return {
+        "id": document.get("id", str(document.get("_id"))),
+        "language": document["language"],
+        "audio_url": document["audio_url"],
+        "text_content": document["text_content"]
+    }
+
+# Large enough to fetch the whole collection in a single batch
+CURSOR_BATCH_SIZE = 256
+
 # Global variables for database connection
 client = None
 database = None
@@ -42,6 +155,10 @@ async def connect_to_mongo():
     """Initialize MongoDB connection with production-ready configuration"""
     global client, database, collection, db_connected
     
+    # One client per process; repeated startup calls reuse it
+    if client is not None and db_connected:
+        return True
+    
     if not MONGODB_URL:
         logger.error("MONGODB_URL environment variable is not set")
         return False
@@ -49,17 +166,25 @@ async def connect_to_mongo():
     logger.info("Attempting to connect to MongoDB Atlas...")
     
     try:
-        # Production-ready connection options
+        # Production-ready connection options. Every uvicorn worker holds
+        # its own pool, so `--workers N` opens up to N * maxPoolSize
+        # connections against the cluster
         connection_options = {
-            'maxPoolSize': 50,
-            'minPoolSize': 5,
+            'maxPoolSize': 10,
+            'minPoolSize': 2,
             'maxIdleTimeMS': 30000,
             'connectTimeoutMS': 20000,
             'socketTimeoutMS': 20000,
             'serverSelectionTimeoutMS': 20000,
             'retryWrites': True,
-            'w': 'majority',
-            'readPreference': 'primary'
+            # Audio records are small and rewritable, so a primary ack is
+            # enough; these options also override any w= in MONGODB_URL
+            'w': 1,
+            'readPreference': 'primary',
+            # text_content compresses well; zlib is the fallback when the
+            # server or client lacks zstd
+            'compressors': 'zstd,zlib',
+            'zlibCompressionLevel': 3
         }
         
         client = AsyncIOMotorClient(MONGODB_URL, **connection_options)
@@ -108,7 +233,7 @@ class AudioFileCreate(BaseModel):
     text_content: str
 
 # Sample data for initial setup
-SAMPLE_AUDIO_DATA = [
+SAMPLE_AUDIO_DATA = (
     {
         "id": "english_audio",
         "language": "english",
@@ -120,45 +245,88 @@ SAMPLE_AUDIO_DATA = [
         "language": "arabic",
         "audio_url": "https://www.soundjay.com/misc/sounds/bell-ringing-04.wav",
         "text_content": "في أرض إلدوريا القديمة، حيث تتألق السماء وتهمس الغابات بأسرارها للريح، عاش تنين يُدعى زيفيروس. ليس من النوع الذي يحرق كل شيء... بل كان لطيفاً وحكيماً، بعيون مثل النجوم القديمة. حتى الطيور كانت تصمت عندما يمر."
-    }
-]
+    },
+)
+
+# In-memory fallback storage, seeded with copies so fallback updates
+# never touch SAMPLE_AUDIO_DATA
+fallback_audio_data = {item["language"]: dict(item) for item in SAMPLE_AUDIO_DATA}
+
+# Serialized fallback list, rebuilt only when fallback_audio_data changes
+_fallback_json: bytes = b"[]"
+
+def rebuild_fallback_json():
+    """Re-serialize the fallback store after it changes"""
+    global _fallback_json
+    # Entries were validated as AudioFileCreate on the way in, so they are
+    # dumped as plain dicts without another pass through Pydantic
+    _fallback_json = orjson.dumps(sorted(fallback_audio_data.values(), key=lambda item: item["language"]))
 
-# In-memory fallback storage
-fallback_audio_data = {}
+rebuild_fallback_json()
+
+# In-process mirror of the collection keyed by language, loaded once at
+# startup and kept in step with every write made through this process
+mirrored_audio_data = {}
+audio_write_lock = asyncio.Lock()
+
+async def load_audio_mirror():
+    """Populate the in-memory mirror from a single pass over the collection"""
+    mirrored_audio_data.clear()
+    async for document in collection.find({}, AUDIO_PROJECTION).batch_size(CURSOR_BATCH_SIZE):
+        mirrored_audio_data[document["language"]] = shape_audio_document(document)
+
+# Serialized /api/audio responses, dropped whenever a write goes through
+AUDIO_CACHE_TTL = 30.0
+_audio_cache: dict[str, tuple[float, bytes]] = {}
+_cache_version = 0
+
+def invalidate_audio_cache():
+    """Discard cached audio list responses after a write"""
+    global _cache_version
+    _cache_version += 1
+    _audio_cache.clear()
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize database connection and sample data"""
-    global collection, fallback_audio_data
-    
+    global db_connected
     logger.info("🚀 Starting ElevenLabs Clone API...")
     
-    # Initialize fallback data first
-    for item in SAMPLE_AUDIO_DATA:
-        fallback_audio_data[item['language']] = item
-    
     # Try to connect to MongoDB
     connected = await connect_to_mongo()
     
     if connected:
         try:
-            # Check if collection exists and has data
-            count = await collection.count_documents({})
-            if count == 0:
-                # Insert sample data
-                await collection.insert_many(SAMPLE_AUDIO_DATA)
-                logger.info(f"✅ Sample audio data inserted into database")
+            # The mirror load doubles as the emptiness check, so sample
+            # languages a user deleted are not brought back on restart
+            await load_audio_mirror()
+            
+            if not mirrored_audio_data:
+                # Seed in one round-trip; upserts keep workers that start
+                # at the same time from colliding on the unique index
+                result = await collection.bulk_write(
+                    [
+                        UpdateOne({"language": item["language"]}, {"$setOnInsert": item}, upsert=True)
+                        for item in SAMPLE_AUDIO_DATA
+                    ],
+                    ordered=False
+                )
+                mirrored_audio_data.update({item["language"]: dict(item) for item in SAMPLE_AUDIO_DATA})
+                logger.info(f"✅ Sample audio data inserted into database ({result.upserted_count} new)")
             else:
-                logger.info(f"✅ Database contains {count} audio files")
+                logger.info(f"✅ Database contains {len(mirrored_audio_data)} audio files")
+            audio_list_endpoint.bind(collection)
         except Exception as e:
             logger.error(f"❌ Error during startup data initialization: {e}")
             logger.info("🔄 Continuing with fallback mode...")
+            # Without a loaded mirror every handler has to agree on
+            # fallback mode, or writes would land where the list never looks
+            db_connected = False
     else:
         logger.warning("⚠️  Running in fallback mode - using in-memory storage")
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Close database connections"""
+    audio_list_endpoint.bind(None)
     await close_mongo_connection()
 
 @app.get("/")
@@ -170,57 +338,80 @@ async def root():
         "status": "healthy"
     }
 
-@app.get("/api/audio", response_model=List[AudioFile])
-async def get_all_audio():
-    """Get all audio files"""
-    
-    if db_connected and collection:
-        try:
-            cursor = collection.find({}).sort("language", 1)
-            audio_files = []
-            async for document in cursor:
-                audio_file = AudioFile(
-                    id=document.get("id", str(document.get("_id"))),
-                    language=document["language"],
-                    audio_url=document["audio_url"],
-                    text_content=document["text_content"]
-                )
-                audio_files.append(audio_file)
-            return audio_files
-        except Exception as e:
-            logger.error(f"Database error, falling back to memory: {e}")
-            # Fall through to fallback mode
-    
-    # Fallback to in-memory data
-    audio_files = []
-    for item in fallback_audio_data.values():
-        audio_file = AudioFile(
-            id=item["id"],
-            language=item["language"],
-            audio_url=item["audio_url"],
-            text_content=item["text_content"]
-        )
-        audio_files.append(audio_file)
-    
-    return sorted(audio_files, key=lambda x: x.language)
+class AudioListEndpoint:
+    """Raw ASGI endpoint serving all audio files as pre-serialized JSON"""
+
+    def __init__(self):
+        self.collection = None
+
+    def bind(self, collection):
+        """Attach the live collection, or None to serve fallback data"""
+        self.collection = collection
+
+    async def __call__(self, scope, receive, send):
+        cached = _audio_cache.get("all")
+        if cached and time.monotonic() - cached[0] < AUDIO_CACHE_TTL:
+            await self.send_json(send, cached[1])
+            return
+
+        # A write landing while we query bumps the version, so a stale
+        # result is never stored over the invalidation
+        version = _cache_version
+        body = None
+        cacheable = True
+
+        # Bound at startup so the hot path reads a local, not module globals
+        collection = self.collection
+        if collection is not None:
+            try:
+                cursor = collection.find({}, AUDIO_PROJECTION).sort("language", 1).batch_size(CURSOR_BATCH_SIZE)
+                body = orjson.dumps([shape_audio_document(document) async for document in cursor])
+            except Exception as e:
+                logger.error(f"Database error, falling back to memory: {e}")
+                # Fall through to fallback mode, but keep the stand-in body
+                # out of the cache so the next request retries the database
+                cacheable = False
+
+        if body is None:
+            # Fallback to in-memory data
+            body = _fallback_json
+
+        if cacheable and version == _cache_version:
+            _audio_cache["all"] = (time.monotonic(), body)
+
+        await self.send_json(send, body)
+
+    @staticmethod
+    async def send_json(send, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+# Registered as a plain Starlette route so the list bypasses FastAPI's
+# response model validation and Response construction. The body still
+# follows List[AudioFile], but the route is not part of the OpenAPI schema
+audio_list_endpoint = AudioListEndpoint()
+app.router.routes.append(Route("/api/audio", audio_list_endpoint, methods=["GET"]))
 
 @app.get("/api/audio/{language}", response_model=AudioFile)
 async def get_audio_by_language(language: str):
     """Get audio file by language"""
     
-    if db_connected and collection:
-        try:
-            document = await collection.find_one({"language": language})
-            if document:
-                return AudioFile(
-                    id=document.get("id", str(document.get("_id"))),
-                    language=document["language"],
-                    audio_url=document["audio_url"],
-                    text_content=document["text_content"]
-                )
-        except Exception as e:
-            logger.error(f"Database error, checking fallback: {e}")
-            # Fall through to fallback mode
+    if db_connected and collection is not None:
+        document = mirrored_audio_data.get(language)
+        if document:
+            return AudioFile(
+                id=document.get("id", str(document.get("_id"))),
+                language=document["language"],
+                audio_url=document["audio_url"],
+                text_content=document["text_content"]
+            )
     
     # Fallback to in-memory data
     if language in fallback_audio_data:
@@ -238,24 +429,27 @@ async def get_audio_by_language(language: str):
 async def create_audio_file(audio_file: AudioFileCreate):
     """Create a new audio file entry"""
     
-    if db_connected and collection:
+    if db_connected and collection is not None:
         try:
-            # Check if audio file for this language already exists
-            existing = await collection.find_one({"language": audio_file.language})
-            if existing:
-                raise HTTPException(status_code=400, detail=f"Audio file for language '{audio_file.language}' already exists")
+            async with audio_write_lock:
+                # Check if audio file for this language already exists
+                if audio_file.language in mirrored_audio_data:
+                    raise HTTPException(status_code=400, detail=f"Audio file for language '{audio_file.language}' already exists")
+                
+                # Create new document
+                document = {
+                    "id": f"{audio_file.language}_audio",
+                    "language": audio_file.language,
+                    "audio_url": audio_file.audio_url,
+                    "text_content": audio_file.text_content
+                }
+                
+                # Insert a copy so the mirrored entry stays free of the ObjectId
+                await collection.insert_one(dict(document))
+                mirrored_audio_data[audio_file.language] = document
+                invalidate_audio_cache()
             
-            # Create new document
-            document = {
-                "id": f"{audio_file.language}_audio",
-                "language": audio_file.language,
-                "audio_url": audio_file.audio_url,
-                "text_content": audio_file.text_content
-            }
-            
-            await collection.insert_one(document)
-            
-            return AudioFile(
+            return AudioFile.model_construct(
                 id=document["id"],
                 language=document["language"],
                 audio_url=document["audio_url"],
@@ -263,6 +457,9 @@ async def create_audio_file(audio_file: AudioFileCreate):
             )
         except HTTPException:
             raise
+        except DuplicateKeyError:
+            # Created through another worker since our mirror was loaded
+            raise HTTPException(status_code=400, detail=f"Audio file for language '{audio_file.language}' already exists")
         except Exception as e:
             logger.error(f"Database error, using fallback: {e}")
             # Fall through to fallback mode
@@ -279,8 +476,10 @@ async def create_audio_file(audio_file: AudioFileCreate):
     }
     
     fallback_audio_data[audio_file.language] = document
+    rebuild_fallback_json()
+    invalidate_audio_cache()
     
-    return AudioFile(
+    return AudioFile.model_construct(
         id=document["id"],
         language=document["language"],
         audio_url=document["audio_url"],
@@ -291,24 +490,33 @@ async def create_audio_file(audio_file: AudioFileCreate):
 async def update_audio_file(language: str, audio_file: AudioFileCreate):
     """Update an existing audio file"""
     
-    if db_connected and collection:
+    if db_connected and collection is not None:
         try:
             update_data = {
                 "audio_url": audio_file.audio_url,
                 "text_content": audio_file.text_content
             }
             
-            result = await collection.update_one(
-                {"language": language},
-                {"$set": update_data}
-            )
-            
-            if result.matched_count == 0:
-                raise HTTPException(status_code=404, detail=f"Audio file not found for language: {language}")
+            async with audio_write_lock:
+                updated_document = await collection.find_one_and_update(
+                    {"language": language},
+                    {"$set": update_data},
+                    projection=AUDIO_PROJECTION,
+                    return_document=ReturnDocument.AFTER
+                )
+                
+                if updated_document is None:
+                    mirrored_audio_data.pop(language, None)
+                    raise HTTPException(status_code=404, detail=f"Audio file not found for language: {language}")
+                
+                # Shape inside the lock so nothing after the committed write
+                # can raise into the fallback branch below
+                updated_document = shape_audio_document(updated_document)
+                mirrored_audio_data[language] = updated_document
+                invalidate_audio_cache()
             
-            updated_document = await collection.find_one({"language": language})
-            return AudioFile(
-                id=updated_document.get("id", str(updated_document.get("_id"))),
+            return AudioFile.model_construct(
+                id=updated_document["id"],
                 language=updated_document["language"],
                 audio_url=updated_document["audio_url"],
                 text_content=updated_document["text_content"]
@@ -327,9 +535,11 @@ async def update_audio_file(language: str, audio_file: AudioFileCreate):
         "audio_url": audio_file.audio_url,
         "text_content": audio_file.text_content
     })
+    rebuild_fallback_json()
+    invalidate_audio_cache()
     
     item = fallback_audio_data[language]
-    return AudioFile(
+    return AudioFile.model_construct(
         id=item["id"],
         language=item["language"],
         audio_url=item["audio_url"],
@@ -340,11 +550,14 @@ async def update_audio_file(language: str, audio_file: AudioFileCreate):
 async def delete_audio_file(language: str):
     """Delete an audio file by language"""
     
-    if db_connected and collection:
+    if db_connected and collection is not None:
         try:
-            result = await collection.delete_one({"language": language})
-            if result.deleted_count == 0:
-                raise HTTPException(status_code=404, detail=f"Audio file not found for language: {language}")
+            async with audio_write_lock:
+                result = await collection.delete_one({"language": language})
+                mirrored_audio_data.pop(language, None)
+                if result.deleted_count == 0:
+                    raise HTTPException(status_code=404, detail=f"Audio file not found for language: {language}")
+                invalidate_audio_cache()
             
             return {"message": f"Audio file for language '{language}' deleted successfully"}
         except HTTPException:
@@ -358,28 +571,43 @@ async def delete_audio_file(language: str):
         raise HTTPException(status_code=404, detail=f"Audio file not found for language: {language}")
     
     del fallback_audio_data[language]
+    rebuild_fallback_json()
+    invalidate_audio_cache()
     return {"message": f"Audio file for language '{language}' deleted successfully"}
 
+# Health responses are fixed per database status, and the ping result is
+# reused for a few seconds so frequent monitor polls stay off the cluster
+HEALTH_PING_INTERVAL = 5.0
+HEALTH_RESPONSES = {
+    db_status: {
+        "status": "healthy",
+        "database": db_status,
+        "version": "1.0.0",
+        "timestamp": "2025-09-13"
+    }
+    for db_status in ("connected", "fallback_mode", "error")
+}
+_last_ping: tuple[float, str] = (float("-inf"), "connected")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for deployment monitoring"""
+    global _last_ping
     db_status = "connected" if db_connected else "fallback_mode"
     
     # Test database if connected
     if db_connected and client:
-        try:
-            await client.admin.command("ping")
-            db_status = "connected"
-        except Exception as e:
-            db_status = "error"
-            logger.error(f"Health check failed: {e}")
+        checked_at, db_status = _last_ping
+        if time.monotonic() - checked_at >= HEALTH_PING_INTERVAL:
+            try:
+                await client.admin.command("ping")
+                db_status = "connected"
+            except Exception as e:
+                db_status = "error"
+                logger.error(f"Health check failed: {e}")
+            _last_ping = (time.monotonic(), db_status)
     
-    return {
-        "status": "healthy",
-        "database": db_status,
-        "version": "1.0.0",
-        "timestamp": "2025-09-13"
-    }
+    return HEALTH_RESPONSES[db_status]
 
 # Root path for deployment
 @app.get("/api")
@@ -402,5 +630,10 @@ if __name__ == "__main__":
         host="0.0.0.0", 
         port=port, 
         reload=False,  # Disable reload in production
+        loop="uvloop",
+        http="httptools",
+        # The mirror and response cache are per process, so extra workers
+        # only see writes made through themselves
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
         log_level="info"
     )
\ No newline at end of file